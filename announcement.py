@@ -33,22 +33,27 @@ TODO: Better format to store announcements(?)
 """
 
 
-class AnnouncementLine:
+from typing import NamedTuple
+
+
+class AnnouncementLine(NamedTuple):
     """
     Class representing one line of an announcement after it has
     been parsed from JSON file
 
+    Lines are immutable and hashable, so they can be used directly as
+    keys when caching rendered text.
+
     Properties:
     text -- text of the line, or None if it is a blank line
     size -- size of text or height of the blank line
-    color -- text color as a PyGame color object
+    color -- text color as an (R, G, B) tuple
     center -- determines if line should be centered on the screen
     """
-    def __init__(self, text=None, size=0, color=None, center=False):
-        self.text = text
-        self.size = size
-        self.color = color
-        self.center = center
+    text: str = None
+    size: int = 0
+    color: tuple = None
+    center: bool = False
 
 
 class Announcement:
@@ -62,6 +67,8 @@ class Announcement:
     lines -- list of AnnouncementLine objects representing the individual
         lines of the announcement
     """
+    __slots__ = ('start_date', 'end_date', 'lines')
+
     def __init__(self, start_date, end_date, lines=None):
         self.start_date = start_date
         self.end_date = end_date
@@ -78,14 +78,18 @@ def main():
     screen_surface = screen.surface
     play_again = True
 
-    while play_again:
-        player = MediaPlayer(
-            surface=screen_surface,
-            config=config,
-            surface_is_display=True)
+    # The same MediaPlayer is reused for every pass so that its caches
+    # remain valid from one pass to the next
+    player = MediaPlayer(
+        surface=screen_surface,
+        config=config,
+        surface_is_display=True)
 
+    while play_again:
         play_again = player.run()
 
+    player.close()
+
     pygame.quit()
 
 
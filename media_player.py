@@ -40,22 +40,79 @@ TODO: Better format to store announcements(?)
 """
 
 
-import datetime
-import glob
+import concurrent.futures
+import fnmatch
+import functools
 import json
 import os
 import random
+import re
 import subprocess
+import sys
+import threading
 import time
 
+from datetime import date, datetime
+
 import pygame
 import pymongo
 
+# pyvips and Pillow are optional. If pyvips is installed it is used to decode
+# and scale photos. Otherwise Pillow (ideally the Pillow-SIMD fork) is used if
+# it is installed, and pygame is used if neither is available.
+try:
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+if pyvips is not None:
+    # Scaled photos are cached by MediaPlayer itself, so libvips' own
+    # operation cache would only use up memory
+    pyvips.cache_set_max(0)
+
 # Wildcard import used here based on standard pygame code style
 from pygame.locals import *
 
 from announcement import Announcement, AnnouncementLine
 from button import Button
+from vlc_player import VlcPlayer
+
+
+# Color used to blank the screen and for blank announcement lines. This is a
+# plain tuple rather than a pygame.Color so that it is immutable and can be
+# used as part of the keys for cached announcement renderings.
+_BLACK = (0, 0, 0)
+
+
+@functools.lru_cache(maxsize=256)
+def _fit_size(
+        img_width: int, img_height: int, width: int, height: int) -> tuple:
+    """
+    Returns the (width, height) that an image of the given size should be
+    scaled to in order to fill as much of an area of the given size as
+    possible while preserving its aspect ratio.
+
+    Results are cached since most photos in a slideshow usually share a
+    handful of sizes.
+    """
+    # Determine what the height will be if we expand the image to
+    # fill the whole width
+    scaled_height = (width * img_height) // img_width
+
+    # If the scaled image is going to be taller than the area,
+    # then limit the maximum height and scale the width instead
+    if scaled_height > height:
+        scaled_height = height
+        scaled_width = (height * img_width) // img_height
+    else:
+        scaled_width = width
+
+    return (scaled_width, scaled_height)
 
 
 class MediaPlayer:
@@ -80,19 +137,50 @@ class MediaPlayer:
         self._photo_files = [item.strip() for item in config['photos']['files']]
         self._photo_time = config['photos']['time']
 
+        # Compiled pattern used to match photo files regardless of case
+        self._photo_pattern = self._compile_wildcards(self._photo_files)
+
+        # Scaled photos are cached so that photos shown again on later passes
+        # do not have to be decoded and scaled again. Each entry maps a
+        # filename to the file's modification time and size and the scaled
+        # surface. The lock is needed since photos are prepared in a
+        # background thread.
+        self._image_cache_size = config['photos'].get('cache_size', 16)
+        self._image_cache = {}
+        self._image_cache_lock = threading.Lock()
+
         self._video_path = config['videos']['path']
         self._video_files = [item.strip() for item in config['videos']['files']]
         self._video_probability = config['videos']['probability']
 
+        # Compiled pattern used to match video files regardless of case
+        self._video_pattern = self._compile_wildcards(self._video_files)
+
+        # omxplayer is used unless VLC is selected in the config file. The
+        # VLC process is started when the first video is played and is then
+        # kept running for all subsequent videos.
+        self._video_player = config['videos'].get('player', 'omxplayer').lower()
+        self._vlc_args = config['videos'].get('vlc_args', [])
+        self._vlc = None
+
         if config['announcements']['source'].lower() == 'mongodb':
             self._use_mongo_db = True
             self._mongo_db_conn_string = os.environ[config['announcements']['db_conn_string']]
             self._mongo_db_name = os.environ[config['announcements']['db_name']]
             self._mongo_db_collection = os.environ[config['announcements']['db_collection']]
+
+            # If an announcement file is also configured, it is used as a
+            # fallback when the database cannot be reached
+            self._announcement_file = config['announcements'].get('file')
         else:
             self._use_mongo_db = False
             self._announcement_file = config['announcements']['file']
 
+        # Announcements parsed from the announcement file are kept until the
+        # file's path, modification time, or size changes
+        self._announcement_file_key = None
+        self._file_announcements = []
+
         self._announcement_font = config['announcements']['font']
         self._announcement_time = config['announcements']['time']
         self._announcement_probability = config['announcements']['probability']
@@ -105,69 +193,281 @@ class MediaPlayer:
             self._joystick = pygame.joystick.Joystick(0)
             self._joystick.init()
 
-    def _show_image(self, filename: str) -> None:
+        # Photo, video, and announcement lists are refreshed by a background
+        # thread every refresh_interval seconds
+        self._refresh_interval = config.get('refresh_interval', 60)
+        self._media_lock = threading.Lock()
+        self._stop_refresh = threading.Event()
+        self._refresh_thread = None
+
+        self._photos = []
+        self._videos = []
+        self._announcements = []
+
+        # Single worker thread used to load and scale the next photo while
+        # the current photo is being shown
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        # Position and letterbox areas for each size of photo shown
+        self._placement_cache = {}
+
+        # Area of the surface that may contain something other than black.
+        # This starts as the whole surface since its contents are unknown.
+        self._content_rect = surface.get_rect()
+
+        # Filename and future for the photo being prepared in the background.
+        # Only one photo is prepared ahead so that memory use stays bounded.
+        self._next_img = None
+
+        # Fonts, rendered lines of text, and complete rendered announcements
+        # are cached so that showing the same announcement again only
+        # requires blitting a surface that has already been rendered
+        self._font_cache = {}
+        self._line_cache = {}
+        self._announcement_cache = {}
+
+    def _load_and_scale_vips(
+            self, filename: str, width: int, height: int) -> pygame.Surface:
         """
-        Loads an image from the specified file and displays it on the screen.
-        
-        Image is scaled to fill as much of screen as possible.
+        Loads and scales an image using libvips.
+
+        libvips decodes and scales the image in a single streaming pass,
+        which is faster and uses much less memory than decoding the full
+        image first when the image is much larger than the screen.
+        """
+        # EXIF orientation is ignored to match the other loaders
+        img = pyvips.Image.thumbnail(
+            filename, width, height=height, no_rotate=True)
+
+        if img.hasalpha():
+            img = img.flatten()
+
+        if img.bands != 3:
+            img = img.colourspace('srgb')
+
+        if img.format != 'uchar':
+            img = img.cast('uchar')
+
+        return pygame.image.frombuffer(
+            img.write_to_memory(), (img.width, img.height),
+            'RGB').convert(self._surface)
+
+    def _load_and_scale_pil(
+            self, filename: str, width: int, height: int) -> pygame.Surface:
+        """
+        Loads and scales an image using Pillow.
+
+        For JPEG files, draft mode lets libjpeg downscale the image while it
+        is being decoded, which is much faster than decoding the full image
+        and scaling it afterwards.
+        """
+        with Image.open(filename) as im:
+            (scaled_width, scaled_height) = _fit_size(
+                im.width, im.height, width, height)
+
+            # Keep twice the target resolution so that the final resize
+            # still has enough detail to filter from
+            im.draft('RGB', (scaled_width * 2, scaled_height * 2))
+
+            if im.mode != 'RGB':
+                im = im.convert('RGB')
+
+            if im.size != (scaled_width, scaled_height):
+                im = im.resize((scaled_width, scaled_height), Image.BILINEAR)
+
+            return pygame.image.frombuffer(
+                im.tobytes(), im.size, 'RGB').convert(self._surface)
+
+    def _load_and_scale_pygame(
+            self, filename: str, width: int, height: int) -> pygame.Surface:
+        """
+        Loads and scales an image using pygame.
         """
         img = pygame.image.load(filename)
 
+        # smoothscale() only works on 24-bit or 32-bit surfaces, so scaling is
+        # done in 32-bit and the result is converted to the display's pixel
+        # format afterwards, which also works for 16-bit displays
+        if img.get_bitsize() not in (24, 32):
+            img = img.convert(32)
+
         img_height = img.get_height()
         img_width = img.get_width()
 
-        # If the image isn't already the same size as the screen,
+        # If the image isn't already the same size as the area,
         # it needs to be scaled
-        if (img_width != self._width
-                or img_height != self._height):
-            # Determine what the height will be if we expand the image to
-            # fill the whole width
-            scaled_height = int(
-                (float(self._width) / img_width) * img_height)
-
-            # If the scaled image is going to be taller than the screen,
-            # then limit the maximum height and scale the width instead
-            if scaled_height > self._height:
-                scaled_height = self._height
-                scaled_width = int(
-                    (float(self._height) / img_height) * img_width)
-            else:
-                scaled_width = self._width
+        if img_width != width or img_height != height:
+            (scaled_width, scaled_height) = _fit_size(
+                img_width, img_height, width, height)
 
-            img_bitsize = img.get_bitsize()
+            # The cost of smoothscale() depends on the size of the source
+            # image, so first halve very large images with the much cheaper
+            # transform.scale() until they are within twice the final size
+            while img_width > 2 * scaled_width:
+                img_width = img_width // 2
+                img_height = img_height // 2
 
-            # transform.smoothscale() can only be used for 24-bit and
-            # 32-bit images. If this is not a 24-bit or 32-bit image,
-            # use transform.scale() instead which will be ugly
-            # but at least will work
-            if img_bitsize in [24, 32]:
-                img = pygame.transform.smoothscale(
-                    img, (scaled_width, scaled_height))
-            else:
-                img = pygame.transform.scale(
-                    img, (scaled_width, scaled_height))
+                img = pygame.transform.scale(img, (img_width, img_height))
 
-            # Determine where to place the image so it will appear
-            # centered on the screen
-            display_x = (self._width - scaled_width) / 2
-            display_y = (self._height - scaled_height) / 2
-        else:
-            # No scaling was applied, so image is already full-screen
-            display_x = 0
-            display_y = 0
+            img = pygame.transform.smoothscale(
+                img, (scaled_width, scaled_height))
+
+        # Converting to the display's pixel format costs one conversion here
+        # but saves a conversion every time the image is blitted
+        return img.convert(self._surface)
+
+    def _load_and_scale(
+            self, filename: str, width: int, height: int) -> pygame.Surface:
+        """
+        Loads an image from the specified file and scales it to fill as much
+        of the given area as possible while preserving its aspect ratio.
+
+        libvips or Pillow is used if it is available. Images that neither
+        can decode are loaded with pygame instead.
+        """
+        if pyvips is not None:
+            try:
+                return self._load_and_scale_vips(filename, width, height)
+            except pyvips.Error:
+                pass
+
+        if Image is not None:
+            try:
+                return self._load_and_scale_pil(filename, width, height)
+            except OSError:
+                pass
+
+        return self._load_and_scale_pygame(filename, width, height)
+
+    def _prepare_image(self, filename: str) -> pygame.Surface:
+        """
+        Loads an image from the specified file and scales it to fill as much
+        of the screen as possible. The returned surface is already in the
+        same pixel format as the screen so that blitting it is a plain copy.
+
+        This is called from the background thread that prepares the next
+        photo while the current one is being shown, so it must not draw
+        to the screen.
+        """
+        # The file size is checked along with the modification time since
+        # FAT file systems, which are common on SD cards and USB drives,
+        # only record modification times to the nearest two seconds
+        stat = os.stat(filename)
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._image_cache_lock:
+            entry = self._image_cache.get(filename)
+
+            if entry is not None and entry[0] == key:
+                return entry[1]
+
+        img = self._load_and_scale(filename, self._width, self._height)
+
+        with self._image_cache_lock:
+            self._image_cache.pop(filename, None)
+
+            # Photos are shown in the same order on every pass, so evicting
+            # the least recently used photo would always evict the photo
+            # that is needed next and the cache would never be hit. Evicting
+            # the most recently added photo instead keeps the rest of the
+            # cache useful from one pass to the next.
+            if len(self._image_cache) >= self._image_cache_size > 0:
+                self._image_cache.popitem()
+
+            if self._image_cache_size > 0:
+                self._image_cache[filename] = (key, img)
+
+        return img
+
+    def _prune_image_cache(self, photos: list) -> None:
+        """
+        Removes cached photos that are no longer in the photo folder.
+        """
+        current = set(photos)
+
+        with self._image_cache_lock:
+            for filename in list(self._image_cache):
+                if filename not in current:
+                    del self._image_cache[filename]
+
+    def _get_placement(self, img_size: tuple) -> tuple:
+        """
+        Returns the rectangle that centers an image of the given size on the
+        screen and a list of the non-empty rectangles around it that may
+        need to be blanked.
+        """
+        (scaled_width, scaled_height) = img_size
+        screen_width = self._width
+        screen_height = self._height
+
+        # Determine where to place the image so it will appear
+        # centered on the screen
+        display_x = (screen_width - scaled_width) // 2
+        display_y = (screen_height - scaled_height) // 2
+
+        letterbox_rects = [
+            pygame.Rect(0, 0, screen_width, display_y),
+            pygame.Rect(
+                0, display_y + scaled_height,
+                screen_width, screen_height - display_y - scaled_height),
+            pygame.Rect(0, display_y, display_x, scaled_height),
+            pygame.Rect(
+                display_x + scaled_width, display_y,
+                screen_width - display_x - scaled_width, scaled_height)]
+
+        letterbox_rects = [
+            rect for rect in letterbox_rects
+            if rect.width > 0 and rect.height > 0]
+
+        img_rect = pygame.Rect(
+            display_x, display_y, scaled_width, scaled_height)
+
+        return (img_rect, letterbox_rects)
+
+    def _show_image(self, img: pygame.Surface) -> None:
+        """
+        Displays an image that has already been prepared by _prepare_image()
+        centered on the screen.
+        """
+        img_size = img.get_size()
 
-        # Blank screen before showing photo in case it
-        # doesn't fill the whole screen
-        self._surface.fill(pygame.Color('black'))
-        self._surface.blit(img, (display_x, display_y))
+        # The position of the image and the letterbox areas around it only
+        # depend on the size of the image, so they are worked out once for
+        # each size
+        placement = self._placement_cache.get(img_size)
 
+        if placement is None:
+            placement = self._get_placement(img_size)
+            self._placement_cache[img_size] = placement
+
+        (img_rect, letterbox_rects) = placement
+
+        # Blank the parts of the screen that the photo doesn't cover, but
+        # only where something was drawn before. The area under the photo
+        # is not blanked since the blit overwrites it.
+        surface = self._surface
+        content_rect = self._content_rect
+        dirty_rects = [img_rect]
+
+        for rect in letterbox_rects:
+            blank_rect = rect.clip(content_rect)
+
+            if blank_rect.width > 0 and blank_rect.height > 0:
+                surface.fill(_BLACK, blank_rect)
+                dirty_rects.append(blank_rect)
+
+        surface.blit(img, img_rect)
+
+        self._content_rect = img_rect
+
+        # Only the changed parts of the screen need to be updated
         if self._surface_is_display:
-            pygame.display.update()
+            pygame.display.update(dirty_rects)
 
     def _show_video(self, filename: str) -> bool:
         """
-        Play a video from the specified file using the external omxplayer
-        utility.
+        Play a video from the specified file using the configured external
+        video player.
 
         Returns True if video played to completion and False if user requested
         to quit during video playback.
@@ -175,123 +475,336 @@ class MediaPlayer:
         # Videos will not be scaled - this needs to be done during transcoding
         # Blank screen before showing video in case it doesn't fill the whole
         # screen
-        self._surface.fill(pygame.Color('black'))
+        content_rect = self._content_rect
+
+        self._surface.fill(_BLACK, content_rect)
 
         if self._surface_is_display:
-            pygame.display.update()
+            pygame.display.update(content_rect)
+
+        if self._video_player == 'vlc':
+            result = self._play_video_vlc(filename)
+        else:
+            result = self._play_video_omxplayer(filename)
+
+        # The video player may have drawn over any part of the screen, so
+        # the whole screen is blanked and updated when the next photo or
+        # announcement is shown
+        self._content_rect = self._surface.get_rect()
+
+        return result
+
+    def _play_video_vlc(self, filename: str) -> bool:
+        """
+        Play a video from the specified file using a persistent VLC process.
+
+        Returns True if video played to completion and False if user requested
+        to quit during video playback.
+        """
+        # Start a new VLC process if this is the first video or if the
+        # previous VLC process has exited
+        if self._vlc is not None and not self._vlc.is_running():
+            self._vlc.close()
+            self._vlc = None
 
-        proc = subprocess.Popen(
-                ['/usr/bin/omxplayer', '-o', 'hdmi', filename], shell=False)
+        if self._vlc is None:
+            self._vlc = VlcPlayer(self._vlc_args)
+
+        self._vlc.play(filename)
+
+        while self._vlc.is_playing():
+            # Check to see if user has requested to quit
+            if self._check_for_quit():
+                self._vlc.stop()
+
+                # Video was interrupted
+                return False
+
+            # Sleep to avoid running CPU at 100%
+            time.sleep(0.5)
+
+        # Video played to completion
+        return True
+
+    def _kill_omxplayer(self) -> None:
+        """
+        Kills any running omxplayer.bin process, which can be left running
+        after the omxplayer wrapper script has exited.
+        """
+        subprocess.run(
+            ['/usr/bin/killall', '-q', 'omxplayer.bin'], check=False)
+
+    def _play_video_omxplayer(self, filename: str) -> bool:
+        """
+        Play a video from the specified file using the external omxplayer
+        utility.
+
+        Returns True if video played to completion and False if user requested
+        to quit during video playback.
+        """
+        proc = subprocess.Popen(['/usr/bin/omxplayer', '-o', 'hdmi', filename])
 
         # Wait for video player process to exit - explicit comparison with None
         # is required to account for when the process returns 0 on completion
         while proc.poll() is None:
             # Check to see if user has requested to quit
             if self._check_for_quit():
-                # Kill the omxplayer wrapper script
-                proc.kill()
+                # /usr/bin/omxplayer is a wrapper script, and terminating it
+                # leaves the actual video process (omxplayer.bin) running, so
+                # that process is always killed directly when quitting
+                proc.terminate()
+                self._kill_omxplayer()
 
-                # Kill the running video process and return to caller
-                subprocess.run(
-                    ['/usr/bin/killall', 'omxplayer.bin'], shell=False)
+                try:
+                    proc.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
                 
                 # Video was interrupted
                 return False
             
             # Sleep to avoid running CPU at 100%
             time.sleep(0.5)
-            
-        # This might not be necessary, but it's there in case any stray copies
-        # of omxplayer.bin are somehow left running
-        subprocess.run(['/usr/bin/killall', 'omxplayer.bin'], shell=False)
+
+        # If omxplayer reported an error, make sure that no stray copy of
+        # omxplayer.bin has been left running. The exit status can only be
+        # trusted here since the wrapper script exited on its own.
+        if proc.returncode != 0:
+            self._kill_omxplayer()
 
         # Video played to completion
         return True
 
-    def _show_announcement(
-            self, announcement: Announcement,
-            text_font: str, line_spacing: int) -> None:
+    def _get_font(self, name: str, size: int) -> pygame.font.Font:
         """
-        Show a text announcement on the screen.
+        Returns a Font object for the given font file and size, creating it
+        only if it has not been used before.
+        """
+        key = (name, size)
 
-        TODO: Modify to use a Font object instead
+        fnt = self._font_cache.get(key)
 
-        Parameters:
-        announcement -- an instance of the Announcement class
-        text_font -- name of the font file to use for rendering
-        line_spacing -- space in pixels to place between each line
+        if fnt is None:
+            fnt = pygame.font.Font(name, size)
+            self._font_cache[key] = fnt
+
+        return fnt
+
+    def _get_line_surface(
+            self, text: str, size: int, color: tuple,
+            font_name: str) -> pygame.Surface:
+        """
+        Returns a surface containing the given text rendered in the given
+        size and color, rendering it only if it has not been rendered before.
         """
+        key = (text, size, color, font_name)
 
-        # Pre-calculate total height of message for centering
+        line_surface = self._line_cache.get(key)
+
+        if line_surface is None:
+            fnt = self._get_font(font_name, size)
+            line_surface = fnt.render(text, True, color)
+            self._line_cache[key] = line_surface
+
+        return line_surface
+
+    def _layout_announcement(
+            self, announcement: Announcement,
+            text_font: str, line_spacing: int) -> list:
+        """
+        Returns a list of (surface, position) tuples representing the
+        rendered lines of an announcement and where to blit them in order
+        to center the whole message on the screen.
+        """
+        # Render and place each line of text in a single pass. Lines are
+        # positioned relative to the top of the message, and the total height
+        # of the message is accumulated for centering.
+        placed_lines = []
         total_height = 0
 
-        for line in announcement.lines:
-            text = line.text
-            size = line.size
+        # Bind frequently used attributes to locals for the loop
+        screen_width = self._width
+        get_line_surface = self._get_line_surface
+        place_line = placed_lines.append
 
-            # Only count lines with text to be rendered
-            if text:
-                fnt = pygame.font.Font(text_font, size)
+        for (text, size, color, center) in announcement.lines:
+            # Only render lines with visible text to be rendered
+            if text and text.strip():
+                line_surface = get_line_surface(text, size, color, text_font)
+
+                if center:
+                    disp_x = (screen_width - line_surface.get_width()) // 2
+                else:
+                    # TODO: allow for arbitrary X position to be specified in
+                    # announcements file
+                    disp_x = 0
 
-                # Calculate size of text to be rendered
-                (line_width, line_height) = fnt.size(text)
+                place_line((line_surface, disp_x, total_height))
 
-                total_height = total_height + line_height + line_spacing
+                # Allow for spacing between each line
+                total_height = (total_height + line_surface.get_height()
+                    + line_spacing)
+            elif text:
+                # Lines containing only whitespace take up the height of a
+                # line of text but have nothing to draw
+                total_height = (total_height
+                    + self._get_font(text_font, size).get_height()
+                    + line_spacing)
             else:
-                # Directly add up "space" elements without using Font object
+                # If line is blank (a "space" element in the JSON file) then
+                # just advance the position without using Font object
                 total_height = total_height + size
 
         # Start at proper position to center whole message on screen
-        current_y = (self._height - total_height) / 2
-        if current_y < 0:
-            current_y = 0
+        top_y = (self._height - total_height) // 2
+        if top_y < 0:
+            top_y = 0
 
-        # Blank screen
-        self._surface.fill(pygame.Color('black'))
+        return [
+            (line_surface, (disp_x, top_y + offset_y))
+            for (line_surface, disp_x, offset_y) in placed_lines]
 
-        if self._surface_is_display:
-            pygame.display.update()
+    def _get_announcement_image(
+            self, announcement: Announcement,
+            text_font: str, line_spacing: int) -> tuple:
+        """
+        Returns a single surface containing all of the rendered lines of an
+        announcement and the position to blit it at, or None if the
+        announcement has no text to draw.
 
-        # Render each line of text
-        for line in announcement.lines:
-            text = line.text
-            size = line.size
-            color = line.color
-            center = line.center
+        The surface only covers the area containing text, on a black
+        background, so that showing the announcement takes one blit.
 
-            # Only render text if there is text to be rendered
-            if text:
-                # Create Font object of given size
-                fnt = pygame.font.Font(text_font, size)
+        Rendered announcements are cached based on the content of the
+        announcement rather than the Announcement object itself, since the
+        announcement list is rebuilt from its source when it changes.
+        """
+        key = (text_font, line_spacing, tuple(announcement.lines))
+
+        if key in self._announcement_cache:
+            return self._announcement_cache[key]
+
+        layout = self._layout_announcement(
+            announcement, text_font, line_spacing)
+
+        if layout:
+            left = min(x for (_, (x, _)) in layout)
+            top = min(y for (_, (_, y)) in layout)
+            right = max(x + surf.get_width() for (surf, (x, _)) in layout)
+            bottom = max(y + surf.get_height() for (surf, (_, y)) in layout)
+
+            # Create the surface in the same pixel format as the screen so
+            # that blitting it is a plain copy
+            image = pygame.Surface(
+                (right - left, bottom - top), 0, self._surface)
+            image.fill(_BLACK)
+
+            blit_sequence = [
+                (surf, (x - left, y - top)) for (surf, (x, y)) in layout]
+
+            # Blit all lines of text in a single call. Surface.fblits() is
+            # only available in pygame-ce, so fall back to Surface.blits()
+            # if it is not present.
+            if hasattr(image, 'fblits'):
+                image.fblits(blit_sequence)
+            else:
+                image.blits(blit_sequence, doreturn=False)
 
-                (line_width, line_height) = fnt.size(text)
+            rendered = (image, (left, top))
+        else:
+            rendered = None
 
-                if center:
-                    disp_x = (self._width - line_width) / 2
-                else:
-                    # TODO: allow for arbitrary X position to be specified in
-                    # announcements file
-                    disp_x = 0 
+        self._announcement_cache[key] = rendered
 
-                disp_y = current_y
+        return rendered
 
-                # Render line of text to a surface and blit it to the
-                # screen buffer
-                line_surface = fnt.render(text, True, color)
-                self._surface.blit(line_surface, (disp_x, disp_y))
+    def _prerender_announcements(self, announcements: list) -> None:
+        """
+        Renders any new or changed announcements now rather than when they
+        are first shown, so that every showing is a single blit.
 
-                # Allow for spacing between each line
-                current_y = current_y + line_height + line_spacing
-            else:
-                # If line is blank (a "space" element in the XML file) then
-                # just advance the position on the screen
-                current_y = current_y + size
+        Cached fonts are kept, but rendered lines and announcements that are
+        not used by any of the given announcements are dropped so that the
+        caches do not keep growing as announcements are edited.
+        """
+        text_font = self._announcement_font
+        line_spacing = self._announcement_line_spacing
+
+        announcement_keys = set()
+        line_keys = set()
+
+        for ann in announcements:
+            self._get_announcement_image(ann, text_font, line_spacing)
+
+            announcement_keys.add((text_font, line_spacing, tuple(ann.lines)))
+            line_keys.update(
+                (line.text, line.size, line.color, text_font)
+                for line in ann.lines)
+
+        self._announcement_cache = {
+            key: rendered
+            for (key, rendered) in self._announcement_cache.items()
+            if key in announcement_keys}
+        self._line_cache = {
+            key: line_surface
+            for (key, line_surface) in self._line_cache.items()
+            if key in line_keys}
+
+    def _show_announcement(
+            self, announcement: Announcement,
+            text_font: str, line_spacing: int) -> None:
+        """
+        Show a text announcement on the screen.
+
+        Parameters:
+        announcement -- an instance of the Announcement class
+        text_font -- name of the font file to use for rendering
+        line_spacing -- space in pixels to place between each line
+        """
+        rendered = self._get_announcement_image(
+            announcement, text_font, line_spacing)
 
-        # If the class's surface is a pygame display, update display after
-        # all lines have been rendered and blitted
+        # Blank whatever was drawn on the screen before
+        dirty_rects = [self._content_rect]
+
+        self._surface.fill(_BLACK, self._content_rect)
+
+        if rendered is not None:
+            (image, position) = rendered
+
+            self._content_rect = self._surface.blit(image, position)
+            dirty_rects.append(self._content_rect)
+        else:
+            self._content_rect = pygame.Rect(0, 0, 0, 0)
+
+        # If the class's surface is a pygame display, update only the changed
+        # parts of the display after the announcement has been blitted
         if self._surface_is_display:
-            pygame.display.update()
+            pygame.display.update(dirty_rects)
     
+    def _wait(self, seconds: float) -> bool:
+        """
+        Waits for the specified number of seconds while continuing to
+        process events.
+
+        Returns True if the full time elapsed and False if user requested
+        to quit while waiting.
+        """
+        next_time = pygame.time.get_ticks() + int(seconds * 1000)
+
+        while pygame.time.get_ticks() < next_time:
+            # Check to see if user has requested to quit
+            if self._check_for_quit():
+                return False
+
+            # Wait briefly to avoid running CPU at 100% while still
+            # responding quickly to a request to quit
+            pygame.time.wait(
+                min(50, max(0, next_time - pygame.time.get_ticks())))
+
+        return True
+
     def _check_for_quit(self) -> bool:
         for event in pygame.event.get():
             if event.type == pygame.KEYDOWN:
@@ -303,140 +816,362 @@ class MediaPlayer:
 
         return False
 
-    def run(self) -> bool:
-        while True:
-            # Create 2 empty lists for photo and video filenames
-            photos = []
-            videos = []
+    def _parse_color(self, value) -> tuple:
+        """
+        Converts a color from the announcement data into an (R, G, B) tuple.
 
-            # Create empty lists for annoucement data
-            announcements = []
-            announcement_data = []
+        Hex colors in '#RRGGBB' or '#RGB' form are decoded directly. Any
+        other value, such as a color name or a list of RGB values, is passed
+        to pygame.Color.
+        """
+        if isinstance(value, str) and value.startswith('#'):
+            hex_digits = value[1:]
 
-            # Get current datetime
-            current_date = datetime.datetime.today().date()
+            # Expand short form so that '#FA0' becomes 'FFAA00'
+            if len(hex_digits) == 3:
+                hex_digits = ''.join(ch * 2 for ch in hex_digits)
 
-            if self._use_mongo_db:
+            if len(hex_digits) == 6:
                 try:
-                    with pymongo.MongoClient(self._mongo_db_conn_string) as mongo_client:
-                        db = mongo_client[self._mongo_db_name]
-                        coll = db[self._mongo_db_collection]
+                    return tuple(bytes.fromhex(hex_digits))
+                except ValueError:
+                    pass
 
-                        announcement_data = list(coll.find())
+        color = pygame.Color(value)
 
-                        mongo_success = True
-                except Exception:
-                    mongo_success = False
-            
-            if not self._use_mongo_db or not mongo_success:
-                with open(self._announcement_file, 'r') as f:
-                    announcement_data = json.load(f)
-
-            # Iterate through all root elements
-            for item in announcement_data:
-                # Get start date and end date for announcement
-                ann_start_date = datetime.datetime.strptime(
-                            item['start_date'], self._date_fmt).date()
-                ann_end_date = datetime.datetime.strptime(
-                            item['end_date'], self._date_fmt).date()
-
-                # Only show announcements that are within the
-                # specified date range
-                if (ann_start_date <= current_date 
-                        and ann_end_date >= current_date):
-                    ann_temp = Announcement(ann_start_date, ann_end_date)
-                    # Iterate through all "line" elements
-                    for line in item['lines']:
-                        # "hspace" elements represent blank vertical spaces
-                        if 'hspace' in line:
-                            ann_temp.lines.append(
-                                AnnouncementLine(
-                                    "", line['hspace'], (0, 0, 0), False))
-                        else:
-                            # Append each line to the list that represents
-                            # the lines of the announcement
-                            ann_temp.lines.append(
-                                AnnouncementLine(
-                                    line['text'], line['size'],
-                                    pygame.Color(line['color']),
-                                    line['center']))
-
-                    # Append each complete announcement to the master list
-                    # of announcements
-                    announcements.append(ann_temp)
-
-            # Find all photos in designated folder based on the
-            # list of extensions. Allow for both uppercase and lowercase
-            # extensions, but not mixed case
-            for wildcard in self._photo_files:
-                photos.extend(
-                    glob.glob(os.path.join(self._photo_path, wildcard.upper())))
-                photos.extend(
-                    glob.glob(os.path.join(self._photo_path, wildcard.lower())))
-
-            # Find all videos in designated folder based on the
-            # list of extensions. Allow for both uppercase and lowercase
-            # extensions, but not mixed case
-            for wildcard in self._video_files:
-                videos.extend(
-                    glob.glob(os.path.join(self._video_path, wildcard.upper())))
-                videos.extend(
-                    glob.glob(os.path.join(self._video_path, wildcard.lower())))
-
-            # Display photos in alphabetical order by filename
-            photos.sort()
+        return (color.r, color.g, color.b)
+
+    def _parse_date(self, value: str) -> date:
+        """
+        Converts a date from the announcement data into a date object using
+        the configured date format.
+
+        Dates in the default '%Y-%m-%d' format are converted directly, which
+        is much faster than strptime().
+        """
+        if (self._date_fmt == '%Y-%m-%d' and len(value) == 10
+                and value[4] == '-' and value[7] == '-'):
+            return date(
+                int(value[0:4]), int(value[5:7]), int(value[8:10]))
+
+        return datetime.strptime(value, self._date_fmt).date()
+
+    def _parse_announcements(self, announcement_data: list) -> list:
+        """
+        Converts announcement data loaded from the JSON file or the database
+        into a list of Announcement objects.
+        """
+        announcements = []
+
+        # Iterate through all root elements
+        for item in announcement_data:
+            # Get start date and end date for announcement
+            ann_start_date = self._parse_date(item['start_date'])
+            ann_end_date = self._parse_date(item['end_date'])
+
+            ann_temp = Announcement(ann_start_date, ann_end_date)
+
+            # Iterate through all "line" elements
+            for line in item['lines']:
+                # "hspace" elements represent blank vertical spaces
+                if 'hspace' in line:
+                    ann_temp.lines.append(
+                        AnnouncementLine(
+                            "", line['hspace'], _BLACK, False))
+                else:
+                    # Append each line to the list that represents
+                    # the lines of the announcement
+                    ann_temp.lines.append(
+                        AnnouncementLine(
+                            line['text'], line['size'],
+                            self._parse_color(line['color']),
+                            line['center']))
+
+            # Append each complete announcement to the master list
+            # of announcements
+            announcements.append(ann_temp)
+
+        return announcements
+
+    def _load_announcement_file(self) -> list:
+        """
+        Returns a list of all announcements in the announcement file.
+
+        The file is only re-read and re-parsed if it has been modified since
+        the last time it was loaded. The file size is checked along with the
+        modification time since some filesystems (such as FAT on an SD card)
+        only store modification times to the nearest 2 seconds, so an edit
+        made right after the file was loaded could otherwise be missed.
+        """
+        stat = os.stat(self._announcement_file)
+        key = (self._announcement_file, stat.st_mtime_ns, stat.st_size)
+
+        if key != self._announcement_file_key:
+            with open(self._announcement_file, 'r') as f:
+                announcement_data = json.load(f)
+
+            self._file_announcements = self._parse_announcements(
+                announcement_data)
+            self._announcement_file_key = key
+
+        return self._file_announcements
+
+    def close(self) -> None:
+        """
+        Shut down the background threads and the external video player
+        if one is running.
+        """
+        self._stop_refresh.set()
+
+        self._executor.shutdown()
+
+        if self._vlc is not None:
+            self._vlc.close()
+            self._vlc = None
+
+    def _compile_wildcards(self, wildcards: list) -> re.Pattern:
+        """
+        Combines a list of filename wildcards (e.g. '*.jpg') into a single
+        compiled regular expression that matches any of them regardless
+        of case.
+
+        As with glob, hidden files (e.g. the '._' files that macOS leaves on
+        SD cards and USB drives) are only matched by wildcards that also
+        start with '.'.
+        """
+        if not wildcards:
+            # Pattern that never matches anything
+            return re.compile(r'(?!)')
+
+        patterns = []
+
+        for wildcard in wildcards:
+            pattern = fnmatch.translate(wildcard)
+
+            if not wildcard.startswith('.'):
+                pattern = r'(?!\.)' + pattern
+
+            patterns.append(pattern)
+
+        return re.compile('|'.join(patterns), re.IGNORECASE)
+
+    def _find_files(self, path: str, pattern: re.Pattern) -> list:
+        """
+        Returns a list of paths of all files in the specified folder whose
+        name matches the given compiled pattern.
+
+        The folder is read with a single directory scan. If the folder
+        cannot be read, an empty list is returned.
+        """
+        try:
+            with os.scandir(path) as entries:
+                return [
+                    entry.path for entry in entries
+                    if entry.is_file() and pattern.match(entry.name)]
+        except OSError:
+            return []
+
+    def _load_current_announcements(self) -> list:
+        """
+        Loads all announcements from the configured source and returns the
+        ones that should be shown today.
+        """
+        # Get current date
+        current_date = date.today()
+
+        all_announcements = None
+
+        if self._use_mongo_db:
+            try:
+                with pymongo.MongoClient(self._mongo_db_conn_string) as mongo_client:
+                    db = mongo_client[self._mongo_db_name]
+                    coll = db[self._mongo_db_collection]
+
+                    announcement_data = list(coll.find())
+
+                    mongo_success = True
+            except Exception:
+                mongo_success = False
+
+            if mongo_success:
+                all_announcements = self._parse_announcements(
+                    announcement_data)
+        
+        if all_announcements is None:
+            if self._announcement_file:
+                all_announcements = self._load_announcement_file()
+            else:
+                all_announcements = []
+
+        # Only show announcements that are within the
+        # specified date range
+        return [
+            ann for ann in all_announcements
+            if ann.start_date <= current_date
+            and ann.end_date >= current_date]
+
+    def _refresh_media(self) -> None:
+        """
+        Finds all photos and videos in their folders and loads the current
+        announcements, then replaces the lists used by the slideshow.
+
+        The photo and video lists are replaced before the announcements are
+        loaded so that a problem with the announcements (e.g. an announcement
+        file that is not valid JSON) does not stop new photos and videos from
+        being picked up. Any such problem is raised to the caller.
+        """
+        # Find all photos and videos in their designated folders based on
+        # the lists of wildcards
+        photos = self._find_files(self._photo_path, self._photo_pattern)
+        videos = self._find_files(self._video_path, self._video_pattern)
+
+        # Display photos in alphabetical order by filename
+        photos.sort()
+
+        # The lists are replaced rather than modified so that the slideshow
+        # can keep using the lists it already has without holding the lock
+        with self._media_lock:
+            self._photos = photos
+            self._videos = videos
+
+        announcements = self._load_current_announcements()
+
+        with self._media_lock:
+            self._announcements = announcements
+
+    def _refresh_loop(self) -> None:
+        """
+        Refreshes the photo, video, and announcement lists in the background
+        until the player is closed.
+        """
+        while not self._stop_refresh.wait(self._refresh_interval):
+            try:
+                self._refresh_media()
+            except Exception as e:
+                # Keep showing the previous announcements (e.g. if the
+                # announcement file is being edited and is not valid JSON
+                # right now) and try again at the next interval
+                print(
+                    f'Error refreshing media: {e!r}', file=sys.stderr)
+
+    def _plan_pass(
+            self, photos: list, videos: list, announcements: list) -> list:
+        """
+        Decides up front which announcement and which video (if any) will
+        follow each photo during one pass through the photos.
+
+        Announcements and videos are chosen based on their specified
+        probabilities, and only if there are any to choose from.
+
+        Returns a list of (photo, announcement, video) tuples where
+        announcement and video are None if nothing is to be shown.
+        """
+        count = len(photos)
+
+        if announcements:
+            ann_choices = random.choices(announcements, k=count)
+            ann_chances = [random.random() for _ in range(count)]
+            planned_announcements = [
+                ann if chance <= self._announcement_probability else None
+                for (ann, chance) in zip(ann_choices, ann_chances)]
+        else:
+            planned_announcements = [None] * count
+
+        if videos:
+            video_choices = random.choices(videos, k=count)
+            video_chances = [random.random() for _ in range(count)]
+            planned_videos = [
+                video if chance <= self._video_probability else None
+                for (video, chance) in zip(video_choices, video_chances)]
+        else:
+            planned_videos = [None] * count
+
+        return list(zip(photos, planned_announcements, planned_videos))
+
+    def run(self) -> bool:
+        # The first scan is done here so that there is something to show
+        # right away and so that any errors are reported to the caller.
+        # After that, scanning is done by a background thread so that it
+        # does not delay the slideshow.
+        if self._refresh_thread is None:
+            self._refresh_media()
+
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_loop, daemon=True)
+            self._refresh_thread.start()
+
+        while True:
+            with self._media_lock:
+                photos = self._photos
+                videos = self._videos
+                announcements = self._announcements
+
+            # Wait for photos to be added to the folder rather than returning
+            # right away, which would make the caller loop at 100% CPU
+            # without checking whether the user has requested to quit
+            if not photos:
+                return self._wait(self._photo_time)
+
+            self._prerender_announcements(announcements)
+
+            self._prune_image_cache(photos)
 
             # Loop through all photos and insert videos at random. Note that the
-            # contents of the folder will be reparsed each time all of the
-            # photos are displayed, so this provides an opportunity to
-            # add/change the contents without restarting the script.
-            for photo in photos:
+            # contents of the folders are rescanned in the background and the
+            # latest lists are picked up each time all of the photos are
+            # displayed, so this provides an opportunity to add/change the
+            # contents without restarting the script.
+            schedule = self._plan_pass(photos, videos, announcements)
+
+            for (index, (photo, announcement, video)) in enumerate(schedule):
                 # Check to see if user has requested to quit
                 if self._check_for_quit():
                     return False
 
-                self._show_image(photo)
+                # The photo list can be slightly out of date, so a photo may
+                # have been deleted or replaced with an unreadable file since
+                # the folder was scanned. Such photos are skipped.
+                try:
+                    if (self._next_img is not None
+                            and self._next_img[0] == photo):
+                        img = self._next_img[1].result()
+                    else:
+                        img = self._prepare_image(photo)
+                except (OSError, pygame.error):
+                    self._next_img = None
+                    continue
+
+                self._show_image(img)
+
+                # Start preparing the next photo while this one is shown.
+                # After the last photo, prepare the first photo since it will
+                # most likely also be the first photo of the next pass.
+                next_photo = photos[(index + 1) % len(photos)]
+
+                self._next_img = (
+                    next_photo,
+                    self._executor.submit(self._prepare_image, next_photo))
+
+                if not self._wait(self._photo_time):
+                    return False
 
-                next_time = time.monotonic() + self._photo_time
-                
-                while time.monotonic() < next_time:
-                    # Check to see if user has requested to quit
-                    if self._check_for_quit():
-                        return False
-                    
-                    # Sleep to avoid running CPU at 100%
-                    time.sleep(0.5)
-
-                # Display announcements based on the specified probability.
-                # Check to be sure we have any announcements to display before
-                # we try to display one.
-                if (random.random() <= self._announcement_probability
-                        and announcements):
+                # Display the announcement chosen for this photo, if any
+                if announcement is not None:
                     self._show_announcement(
-                        random.choice(announcements),
+                        announcement,
                         self._announcement_font,
                         self._announcement_line_spacing)
 
-                    next_time = time.monotonic() + self._announcement_time
-
-                    while time.monotonic() < next_time:
-                        # Check to see if user has requested to quit
-                        if self._check_for_quit():
-                            return False
-                        
-                        # Sleep to avoid running CPU at 100%
-                        time.sleep(0.5)
+                    if not self._wait(self._announcement_time):
+                        return False
 
                 # Check to see if user has requested to quit
                 if self._check_for_quit():
                     return False
 
-                # Play videos based on the specified probability.
-                # Check to be sure we have any videos to play before we try
-                # to play one.
-                if (random.random() <= self._video_probability
-                        and videos):
-                    if not self._show_video(random.choice(videos)):
+                # Play the video chosen for this photo, if any
+                if video is not None:
+                    if not self._show_video(video):
                         # _show_video() returns False if user requested to
                         # quit during video playback
                         return False
@@ -0,0 +1,155 @@
+# MIT License
+
+# Copyright (c) 2021 David Rice
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""
+Media Player and Announcement Board
+
+VLC player class
+
+https://github.com/davidsmakerworks/media-display
+"""
+
+
+import queue
+import subprocess
+import threading
+import time
+
+
+class VlcPlayer:
+    """
+    Class representing a single long-running VLC process that is controlled
+    through its remote control (rc) interface.
+
+    Keeping one VLC process running for all videos avoids the delay of
+    starting and initializing a new video player process for every video.
+
+    Properties:
+    args -- list of additional command line arguments to pass to VLC,
+        such as the hardware decoder and video output to use
+    start_timeout -- number of seconds to wait for playback to start before
+        giving up on a video
+    """
+    def __init__(self, args: list = None, start_timeout: float = 10) -> None:
+        cmd = [
+            '/usr/bin/cvlc', '--intf', 'rc', '--rc-fake-tty',
+            '--fullscreen', '--play-and-stop', '--no-video-title-show']
+
+        if args:
+            cmd.extend(args)
+
+        self.start_timeout = start_timeout
+
+        self._proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, universal_newlines=True, bufsize=1)
+
+        # Output from VLC is read by a background thread so that checking
+        # the playback status never blocks
+        self._output = queue.Queue()
+
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+
+        self._playing = False
+        self._started = False
+        self._start_time = 0
+
+    def _read_output(self) -> None:
+        for line in self._proc.stdout:
+            self._output.put(line)
+
+    def _send(self, command: str) -> None:
+        try:
+            self._proc.stdin.write(command + '\n')
+            self._proc.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            # VLC has exited, which is_playing() will detect
+            pass
+
+    def is_running(self) -> bool:
+        """
+        Returns True if the VLC process is still running.
+        """
+        return self._proc.poll() is None
+
+    def play(self, filename: str) -> None:
+        """
+        Start playing the specified video file.
+        """
+        # Discard any status messages left over from the previous video
+        while not self._output.empty():
+            self._output.get_nowait()
+
+        self._send('clear')
+        self._send('add ' + filename)
+
+        self._playing = True
+        self._started = False
+        self._start_time = time.monotonic()
+
+    def is_playing(self) -> bool:
+        """
+        Returns True if the current video is still playing.
+        """
+        if not self.is_running():
+            self._playing = False
+
+        while self._playing and not self._output.empty():
+            line = self._output.get_nowait()
+
+            # Only accept a stop event once playback of the new video
+            # has been reported as started
+            if 'play state' in line:
+                self._started = True
+            elif self._started and 'stop state' in line:
+                self._playing = False
+
+        if (self._playing and not self._started
+                and time.monotonic() - self._start_time > self.start_timeout):
+            self._playing = False
+
+        return self._playing
+
+    def stop(self) -> None:
+        """
+        Stop the current video.
+        """
+        self._send('stop')
+        self._playing = False
+
+    def close(self) -> None:
+        """
+        Shut down the VLC process.
+        """
+        self._send('quit')
+
+        try:
+            self._proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+
+
+if __name__ == '__main__':
+    print('This file should not be run directly. Run main.py instead.')